@@ -1,5 +1,6 @@
 # Librerías a usar
 from concurrent import futures as futures
+import csv
 from datetime import datetime, timedelta
 import json
 import logging
@@ -10,22 +11,24 @@ import time
 from traceback import TracebackException
 
 from dotenv import dotenv_values
-from openpyxl import load_workbook, Workbook
+import lxml.html
+import numpy as np
+import orjson
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver import Firefox, FirefoxOptions
 from selenium.webdriver.firefox.service import Service
-from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from seleniumwire.utils import decode
-from seleniumwire.webdriver import ChromeOptions, Firefox, FirefoxOptions
 from webdriver_manager.firefox import GeckoDriverManager
 
 # Constantes
 CURRENT_DATE = datetime.now().date()
 ROOT_PATH = os.getcwd()
 LOGGER = logging.getLogger(__name__)
-THREAD = futures.ThreadPoolExecutor()
 ENV = dotenv_values()
 DATA_FILENAME = ENV["DATA_FILENAME"]
 DATA_FOLDER = ENV["DATA_FOLDER"]
@@ -33,8 +36,33 @@ LOG_FILENAME = ENV["LOG_FILENAME"]
 LOG_FOLDER = ENV["LOG_FOLDER"]
 METADATA_FILENAME = ENV["METADATA_FILENAME"]
 METADATA_SHEET_NAME = ENV["METADATA_SHEET_NAME"]
+METADATA_FORMAT = (ENV.get("METADATA_FORMAT") or "csv").lower()
 FB_USERNAME = ENV["FB_USERNAME"]
 FB_PASSWORD = ENV["FB_PASSWORD"]
+MAX_WORKERS = int(ENV.get("MAX_WORKERS") or os.cpu_count())
+DOM_SCRAPING = (ENV.get("DOM_SCRAPING") or "false").lower() == "true"
+COOKIES_FILENAME = os.path.join(ROOT_PATH, ".cookies.json")
+DRIVER_PATH_FILENAME = os.path.join(ROOT_PATH, ".driver_path")
+# Tiempo en segundos durante el cual se reutiliza la ruta del driver sin buscar actualizaciones
+DRIVER_PATH_MAX_AGE = 24 * 60 * 60
+RESTAURANT_CARD_SELECTOR = "div.sc-c2b2dc55-4.bkatcD > a"
+PRODUCT_COLUMNS = [
+    "Popular",
+    "Producto",
+    "Descripcion",
+    "Precio con descuento",
+    "Precio sin descuento",
+    "Restaurante",
+    "Disponible",
+    "Categoria",
+]
+# Expresiones regulares
+NEXT_DATA_REGEX = re.compile(
+    '<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.DOTALL
+)
+THOUSANDS_REGEX = re.compile(r"(\d)(?=(\d{3})+$)")
+OPENING_HOUR_REGEX = re.compile(r"^Abre.+")
+NAME_SUFFIX_REGEX = re.compile(r" -.+")
 
 
 
@@ -125,37 +153,83 @@ class ScraperRappiProducts:
 
     Attributes:
         metadata (Metadata): Objeto que maneja toda la información generada por el scraper durante su ejecución
-        products (list): Lista que contiene todos los productos que ofertan los restaurantes en Rappi
+        products (dict): Fila del archivo sin procesar y popularidad de cada producto, indexados por restaurante, nombre y descripción
+        raw_path (str): Ruta del archivo donde se van escribiendo los productos extraídos sin procesar
+        raw_file (TextIOWrapper): Archivo donde se van escribiendo los productos extraídos sin procesar
+        raw_writer (writer): Objeto que escribe los productos extraídos en el archivo sin procesar
+        raw_rows (int): Cantidad de filas escritas en el archivo sin procesar
+        restaurants (dict): Restaurantes detectados con su nombre, enlace web y disponibilidad, indexados por su enlace web
         dataset (DataFrame): DataFrame que contiene toda la información extraída por el scraper
-        links_to_go (list): Lista de restaurantes que en un primer intento no se pudo extraer su información
+        links_to_go (dict): Restaurantes que en un primer intento no se pudo extraer su información, indexados por su enlace web
         driver (WebDriver): Objeto que maneja el navegador web
         wait (WebDriverWait): Objeto que maneja los tiempos de espera de búsqueda de elementos en la web
-        action (ActionChains): Objeto que maneja las acciones que se pueden aplicar a los elementos en la web
+        session (Session): Sesión HTTP que reutiliza las cookies del navegador para obtener los datos de los restaurantes
+        build_id (str): Identificador de la versión de la página de restaurantes generada por Next.js
     """
 
     def __init__(self):
         """Genera todos los atributos para una instancia de la clase ScraperRappiProducts"""
         LOGGER.info("Inicializando scraper")
         self._metadata = Metadata()
-        self._products = []
-        self._restaurants = []
+        self._products = {}
+        self._raw_path = None
+        self._raw_file = None
+        self._raw_writer = None
+        self._raw_rows = 0
+        self._restaurants = {}
         self._dataset = pd.DataFrame()
-        self._links_to_go = []
+        self._links_to_go = {}
+        self._driver = None
+        self._wait = None
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+        self._build_id = None
+        LOGGER.info("Scraper inicializado satisfactoriamente")
+
+    def get_driver_path(self):
+        """Obtiene la ruta del driver del navegador, buscando actualizaciones como máximo una vez al día
+
+        Returns:
+            str: Ruta del ejecutable del driver
+        """
+        # Reutilizando la ruta guardada si es reciente y el driver todavía existe
+        if (
+            os.path.isfile(DRIVER_PATH_FILENAME)
+            and time.time() - os.path.getmtime(DRIVER_PATH_FILENAME)
+            < DRIVER_PATH_MAX_AGE
+        ):
+            with open(DRIVER_PATH_FILENAME, encoding="utf-8") as file:
+                driver_path = file.read().strip()
+            if os.path.isfile(driver_path):
+                return driver_path
+        driver_path = GeckoDriverManager().install()
+        with open(DRIVER_PATH_FILENAME, "w", encoding="utf-8") as file:
+            file.write(driver_path)
+        return driver_path
+
+    def start_driver(self):
+        """Abre el navegador web usado para iniciar sesión y para la extracción mediante el DOM"""
+        LOGGER.info("Abriendo el navegador")
         firefox_options = FirefoxOptions()
-        chrome_options = ChromeOptions()
+        # Navegador sin interfaz gráfica
+        firefox_options.add_argument("-headless")
+        firefox_options.add_argument("--width=1920")
+        firefox_options.add_argument("--height=1080")
+        # Evitar la descarga de recursos que no se usan durante la extracción
         prefs = {
-            "profile.default_content_setting_values.notifications": 2,
-            "profile.managed_default_content_settings.popups": 2,
+            "dom.webnotifications.enabled": False,
+            "permissions.default.image": 2,
+            "gfx.downloadable_fonts.enabled": False,
+            "media.autoplay.default": 5,
+            "media.autoplay.blocking_policy": 2,
         }
-        chrome_options.add_experimental_option("prefs", prefs)
-        chrome_options.add_experimental_option(
-            "excludeSwitches", ["enable-logging"]
-        )  # Suprimir los mensajes de consola
-        self._driver = Firefox(options=firefox_options,service=Service(GeckoDriverManager().install()))
-        self._driver.maximize_window()
+        for key, value in prefs.items():
+            firefox_options.set_preference(key, value)
+        self._driver = Firefox(
+            options=firefox_options,
+            service=Service(self.get_driver_path()),
+        )
         self._wait = WebDriverWait(self._driver, 10)
-        self._action = ActionChains(self._driver)
-        LOGGER.info("Scraper inicializado satisfactoriamente")
 
     def login(self, user_name, user_password):
         """Inicia sesión en la página web de Rapi usando una cuenta de Facebook
@@ -165,6 +239,8 @@ class ScraperRappiProducts:
             user_password (str): Contraseña del usuario activo de facebook
         """
         LOGGER.info("Iniciando sesión")
+        if self._driver is None:
+            self.start_driver()
         self._driver.get("https://www.rappi.com.pe/login")
         # Usar la opción de facebook
         self._driver.find_element(
@@ -203,8 +279,106 @@ class ScraperRappiProducts:
                 (By.XPATH, "//div[@class='sc-fdt2fy-11 dJNVzE']")
             )
         )
+        # Guardar la sesión del navegador para reutilizarla en las peticiones HTTP
+        with open(COOKIES_FILENAME, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "user_agent": self._driver.execute_script(
+                        "return navigator.userAgent"
+                    ),
+                    "cookies": self._driver.get_cookies(),
+                },
+                file,
+            )
+        # El navegador solo se sigue usando en la extracción mediante el DOM
+        if not DOM_SCRAPING:
+            self._driver.quit()
+            self._driver = None
+            self._wait = None
         LOGGER.info("Se inició sesión correctamente")
 
+    def load_session(self, user_name, user_password):
+        """Carga la sesión de Rappi guardada en disco, iniciando sesión con el navegador solo si es necesario
+
+        Args:
+            user_name (str): Usuario activo de facebook
+            user_password (str): Contraseña del usuario activo de facebook
+        """
+        # El navegador debe tener la sesión iniciada para la extracción mediante el DOM
+        saved_session = not DOM_SCRAPING and os.path.isfile(COOKIES_FILENAME)
+        if not saved_session:
+            self.login(user_name, user_password)
+        self.load_cookies()
+        self.load_build_id()
+        # Comprobando que el servidor siga aceptando la sesión guardada
+        if saved_session and not self.is_session_valid():
+            LOGGER.info("La sesión guardada ha sido invalidada por el servidor")
+            os.remove(COOKIES_FILENAME)
+            self._session.cookies.clear()
+            self.login(user_name, user_password)
+            self.load_cookies()
+
+    def is_session_valid(self):
+        """Comprueba si el servidor acepta la sesión HTTP al solicitar el listado de restaurantes
+
+        Returns:
+            bool: False si el servidor rechaza la sesión, True en caso contrario
+        """
+        try:
+            self.get_page_props("restaurantes")
+        except requests.HTTPError as error:
+            if error.response.status_code in (401, 403):
+                return False
+            raise
+        return True
+
+    def load_cookies(self):
+        """Carga en la sesión HTTP las cookies guardadas al iniciar sesión con el navegador"""
+        with open(COOKIES_FILENAME, encoding="utf-8") as file:
+            session_data = json.load(file)
+        for cookie in session_data["cookies"]:
+            self._session.cookies.set(
+                cookie["name"], cookie["value"], domain=cookie.get("domain")
+            )
+        self._session.headers.update({"User-Agent": session_data["user_agent"]})
+
+    def load_build_id(self):
+        """Obtiene el identificador de la versión de la página de restaurantes generada por Next.js"""
+        response = self._session.get("https://www.rappi.com.pe/restaurantes", timeout=10)
+        response.raise_for_status()
+        next_data = NEXT_DATA_REGEX.search(response.text).group(1)
+        self._build_id = orjson.loads(next_data)["buildId"]
+
+    def get_page_props(self, path, params=None):
+        """Obtiene los datos generados por Next.js de una página de Rappi
+
+        Args:
+            path (str): Ruta de la página sin el dominio, por ejemplo restaurantes/<slug>
+            params (dict, optional): Parámetros de la consulta. Defaults to None.
+
+        Returns:
+            dict: Propiedades de la página (pageProps)
+        """
+        response = self._session.get(
+            f"https://www.rappi.com.pe/_next/data/{self._build_id}/{path}.json",
+            params=params,
+            headers={"Accept": "application/json"},
+            timeout=10,
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)["pageProps"]
+
+    def get_text(self, element):
+        """Obtiene el texto de un elemento HTML normalizando los espacios como lo hace el navegador
+
+        Args:
+            element (HtmlElement): Elemento HTML
+
+        Returns:
+            str: Texto del elemento con los espacios, saltos de línea y espacios duros reducidos a un espacio
+        """
+        return " ".join(element.text_content().split())
+
     def scrap_product(self, product, rest, status, cat):
         """Extrae la información de un producto de un restaurante
 
@@ -219,29 +393,30 @@ class ScraperRappiProducts:
         """
         data = []
         try:
+            # Obtener el HTML del producto en una sola llamada al navegador
+            tree = lxml.html.fromstring(product.get_attribute("outerHTML"))
+            # Descartar los nodos que el navegador no muestra
+            for node in tree.xpath(
+                ".//script | .//style | .//*[@hidden]"
+                " | .//*[contains(translate(@style, ' ', ''), 'display:none')]"
+            ):
+                node.drop_tree()
             # Popularidad
-            try:
-                product.find_element(
-                    By.XPATH, ".//p[@class='chakra-text css-n0gvg7']"
-                ).text
-                data.append(True)
-            except:
-                data.append(False)
+            data.append(bool(tree.xpath(".//p[@class='chakra-text css-n0gvg7']")))
             # Nombre
-            data.append(
-                product.find_element(By.XPATH, ".//div[@class='css-k008qs']").text
-            )
+            data.append(self.get_text(tree.xpath(".//div[@class='css-k008qs']")[0]))
             # Descripción
             data.append(
-                product.find_element(
-                    By.XPATH,
-                    ".//p[@class='chakra-text sc-a04fe063-2 gHQcCO css-1rmjo0r']",
-                ).text
+                self.get_text(
+                    tree.xpath(
+                        ".//p[@class='chakra-text sc-a04fe063-2 gHQcCO css-1rmjo0r']"
+                    )[0]
+                )
             )
             # Precios
-            prices = product.find_element(
-                By.XPATH, ".//.//div[contains(@class, 'chakra-skeleton')]"
-            ).text.split("S/ ")
+            prices = self.get_text(
+                tree.xpath(".//div[contains(@class, 'chakra-skeleton')]")[0]
+            ).split("S/ ")
             # Precio con descuento
             try:
                 data.append(prices[-2])
@@ -287,57 +462,80 @@ class ScraperRappiProducts:
             except:
                 LOGGER.info(f"El restaurante no posee ninguna categoría")
                 category = None
-            # Extrayendo la información de varios productos a la vez
-            future_products = [
-                THREAD.submit(self.scrap_product, product, rest, status, category)
+            # Extrayendo la información de los productos
+            self.add_products(
+                self.scrap_product(product, rest, status, category)
                 for product in products
-            ]
-            for future_product in futures.wait(future_products).done:
-                self._products.append(future_product.result())
+            )
         except Exception as error:
             LOGGER.error("Fallo al extraer la información de los productos")
             LOGGER.error(f"Error de tipo: {error.__class__}")
 
-    def extract_products(self, restaurant):
-        """Extrae la información de los productos de un restaurante usando los recursos de red
+    def get_restaurant_info(self, restaurant):
+        """Obtiene el nombre, enlace web y disponibilidad de un restaurante
 
         Args:
             restaurant (WebElement): Elemento web que representa a un restaurante
+
+        Returns:
+            tuple: Nombre, enlace web y disponibilidad del restaurante
         """
+        # Disponibilidad del restaurante
         try:
-            self._action.scroll_to_element(restaurant).move_to_element(
-                restaurant
-            ).perform()
-            # Disponibilidad del restaurante
-            try:
-                restaurant_status = restaurant.find_element(
-                    By.XPATH, ".//p[contains(@class,'chakra-text')]"
-                ).text
-            except:
-                restaurant_status = "Restaurante abierto"
-            # Enlace web del restaurante
-            restaurant_link = restaurant.get_attribute("href")
-            self._restaurants.append(restaurant_link)
-            # Request que contiene la información del restaurante
-            request = self._driver.wait_for_request(
-                re.search("restaurantes/(.*)", restaurant_link).group(1),
-                timeout=3,
+            restaurant_status = restaurant.find_element(
+                By.XPATH, ".//p[contains(@class,'chakra-text')]"
+            ).text
+        except:
+            restaurant_status = "Restaurante abierto"
+        return (
+            restaurant.get_attribute("aria-label"),
+            restaurant.get_attribute("href"),
+            restaurant_status,
+        )
+
+    def add_products(self, products):
+        """Escribe los productos extraídos en el archivo sin procesar descartando los duplicados de un mismo restaurante
+
+        Si un producto se repite se conserva el registro marcado como popular. En memoria solo
+        se guarda la fila del archivo que corresponde a cada producto
+
+        Args:
+            products (iterable): Productos extraídos de un restaurante
+        """
+        for product in products:
+            if not product:
+                continue
+            key = (product[5], product[1], product[2])
+            current = self._products.get(key)
+            if current is None or (product[0] and not current[1]):
+                self._raw_writer.writerow(product)
+                self._products[key] = (self._raw_rows, product[0])
+                self._raw_rows += 1
+
+    def extract_products(self, rest_name, restaurant_link, restaurant_status):
+        """Extrae la información de los productos de un restaurante usando los datos de Next.js
+
+        Args:
+            rest_name (str): Nombre del restaurante
+            restaurant_link (str): Enlace web del restaurante
+            restaurant_status (str): Estado actual del restaurante
+
+        Returns:
+            list: Arreglo con la información de todos los productos del restaurante, vacío si no se pudo extraer
+        """
+        try:
+            # Datos del restaurante generados por Next.js
+            page_props = self.get_page_props(
+                f"restaurantes/{restaurant_link.split('/restaurantes/', 1)[1]}"
             )
-            # Obteniendo la respuesta decodificada del request
-            decoded_body = decode(
-                request.response.body,
-                request.response.headers.get("Content-Encoding", "identity"),
-            ).decode("utf-8")
-            # Convirtiendo en formato json
-            json_data = json.loads(decoded_body)
-            rest_dict = json_data["pageProps"]["fallback"]
+            rest_dict = page_props["fallback"]
             restaurant_data = rest_dict[next(iter(rest_dict))]
             # Nombre y categoría del restaurante
             restaurant_name = restaurant_data.get("brandName")
             restaurant_category = restaurant_data.get("categories")
             return [
                 [
-                    product.get("isPopular", False),
+                    bool(product.get("isPopular")),
                     product.get("name"),
                     product.get("description"),
                     product.get("priceNumber"),
@@ -350,22 +548,37 @@ class ScraperRappiProducts:
                 for product in product_category["products"]
             ]
         except Exception as error:
-            self._metadata.num_errors += 1
-            rest_name = restaurant.get_attribute("aria-label")
             LOGGER.error(
                 f"Fallo al intentar extraer la información de los productos ofrecidos por el restaurante {rest_name}"
             )
             LOGGER.error(error)
-            self._links_to_go.append((rest_name, restaurant_link, restaurant_status))
+            self._links_to_go[restaurant_link] = (
+                rest_name,
+                restaurant_link,
+                restaurant_status,
+            )
             return []
 
-    def extract_data(self):
-        """Extrae todos los productos que ofertan los restaurantes en Rappi"""
-        LOGGER.info("Extrayendo los productos de rappi")
+    def wait_restaurants(self, previous_count):
+        """Espera a que la página muestre más restaurantes de los que ya había
+
+        Args:
+            previous_count (int): Cantidad de restaurantes mostrados antes de la espera
+        """
+        WebDriverWait(self._driver, 10, poll_frequency=0.2).until(
+            lambda driver: driver.execute_script(
+                "return document.querySelectorAll(arguments[0]).length",
+                RESTAURANT_CARD_SELECTOR,
+            )
+            > previous_count
+        )
+
+    def scrap_restaurants(self):
+        """Detecta los restaurantes de Rappi navegando por la página con el navegador"""
+        LOGGER.info("Detectando los restaurantes de rappi mediante el navegador")
         self._driver.get("https://www.rappi.com.pe/restaurantes")
-        del self._driver.requests
 
-        # Extracción de información de los restaurantes más cercanos
+        # Recolección de los restaurantes más cercanos
         no_error = True
         start = 0
         while no_error:
@@ -382,38 +595,31 @@ class ScraperRappiProducts:
             except Exception as error:
                 no_error = False
 
-            # Esperando a que se carguen los restaurantes
-            time.sleep(random.uniform(2.0, 3.0))
-            restaurants = self._wait.until(
-                lambda x: x.find_elements(
-                    By.XPATH,
-                    "//div[@class='sc-c2b2dc55-4 bkatcD']/a",
-                )
+            # Esperando a que se carguen los nuevos restaurantes
+            try:
+                self.wait_restaurants(start)
+            except TimeoutException:
+                break
+            restaurants = self._driver.find_elements(
+                By.CSS_SELECTOR, RESTAURANT_CARD_SELECTOR
             )
             end = len(restaurants)
-            # Interactuando con varios restaurantes a la vez
-            future_restaurants = [
-                THREAD.submit(self.extract_products, restaurants[index])
-                for index in range(start, end)
-            ]
-            for future_restaurant in futures.wait(future_restaurants).done:
-                self._products += future_restaurant.result()
+            # Guardando la información de los nuevos restaurantes
+            for index in range(start, end):
+                restaurant = self.get_restaurant_info(restaurants[index])
+                self._restaurants[restaurant[1]] = restaurant
             LOGGER.info(f"Cantidad de restaurantes totales recorridos: {end}")
             # Dar click al botón de ver más restaurantes
             try:
-                del self._driver.requests
                 button.click()
                 start = end
             except:
                 no_error = False
 
-        LOGGER.info(
-            f"Se extrajo la información de {len(self._restaurants)} restaurante(s)"
-        )
+        LOGGER.info(f"Se han detectado {len(self._restaurants)} restaurante(s)")
 
-        # Extracción de información de los restaurantes por categorías
+        # Recolección de los restaurantes por categorías
         self._driver.get("https://www.rappi.com.pe/restaurantes")
-        del self._driver.requests
         # Categorías de los restaurantes
         categories = self._driver.find_elements(
             By.XPATH, "//button[@class='sc-5d042f5c-1 iyWZJm']"
@@ -427,15 +633,23 @@ class ScraperRappiProducts:
             self._driver.execute_script(
                 "window.scrollTo(document.body.scrollHeight, 0)"
             )
-            time.sleep(random.uniform(1.0, 1.5))
+            # Restaurantes mostrados antes de cambiar de categoría
+            previous_restaurants = self._driver.find_elements(
+                By.CSS_SELECTOR, RESTAURANT_CARD_SELECTOR
+            )[:1]
             # Dar click a una categoría
             try:
-                category.click()
-                time.sleep(random.uniform(7.0, 8.0))
+                self._wait.until(EC.element_to_be_clickable(category)).click()
             except Exception as error:
                 LOGGER.error("No se ha podido dar click a la categoría")
                 LOGGER.error(f"Error de tipo {error.__class__}")
                 continue
+            # Esperando a que se reemplacen los restaurantes mostrados
+            if previous_restaurants:
+                try:
+                    self._wait.until(EC.staleness_of(previous_restaurants[0]))
+                except TimeoutException:
+                    pass
             # Dar click a la flecha de navegación de las categorías
             try:
                 self._driver.find_element(By.CLASS_NAME, "sc-69ee8a42-2").click()
@@ -444,80 +658,209 @@ class ScraperRappiProducts:
             # Identificar si la categoría cuenta con restaurantes
             try:
                 # Identificar los restaurantes pertenecientes a la categoría seleccionada
-                restaurants = self._wait.until(
-                    lambda x: x.find_elements(
-                        By.XPATH, "//div[@class='sc-c2b2dc55-4 bkatcD']/a"
-                    )
+                self.wait_restaurants(0)
+                restaurants = self._driver.find_elements(
+                    By.CSS_SELECTOR, RESTAURANT_CARD_SELECTOR
+                )
+                # Filtrar los restaurantes que ya han sido detectados
+                links = self._driver.execute_script(
+                    "return Array.from(document.querySelectorAll(arguments[0])).map(e => e.href)",
+                    RESTAURANT_CARD_SELECTOR,
                 )
-                # Filtrar los restaurantes con las que ya se cuente información
                 restaurants = [
                     restaurant
-                    for restaurant in restaurants
-                    if restaurant.get_attribute("href") not in self._restaurants
+                    for restaurant, link in zip(restaurants, links)
+                    if link not in self._restaurants
                 ]
-                del self._driver.requests
                 LOGGER.info(
-                    f"Se va a extraer información de los productos de {len(restaurants)} restaurante(s)"
+                    f"Se han detectado {len(restaurants)} restaurante(s) nuevos"
                 )
             except:
                 LOGGER.info("La categoría no cuenta con restaurantes")
                 continue
-            # Extraer la información de varios restaurantes a la vez
-            future_restaurants = [
-                THREAD.submit(self.extract_products, restaurant)
-                for restaurant in restaurants
+            for restaurant in restaurants:
+                restaurant = self.get_restaurant_info(restaurant)
+                self._restaurants[restaurant[1]] = restaurant
+
+    def find_restaurants(self, node):
+        """Busca recursivamente los restaurantes dentro de los datos generados por Next.js
+
+        Args:
+            node (dict | list): Nodo de los datos de la página
+
+        Returns:
+            list: Arreglo con el nombre, enlace web y disponibilidad de los restaurantes encontrados
+        """
+        if isinstance(node, list):
+            return [
+                restaurant for item in node for restaurant in self.find_restaurants(item)
+            ]
+        if not isinstance(node, dict):
+            return []
+        if "friendlyUrl" in node:
+            return [
+                (
+                    node.get("brandName") or node.get("name"),
+                    f"https://www.rappi.com.pe/restaurantes/{node['friendlyUrl']}",
+                    "Restaurante abierto"
+                    if node.get("isOpen", True)
+                    else "Restaurante cerrado",
+                )
             ]
-            for future_restaurant in futures.wait(future_restaurants).done:
-                self._products += future_restaurant.result()
-            del self._driver.requests
-
-        # Eliminar valores duplicados:
-        self._links_to_go = list(set(self._links_to_go))
-        LOGGER.info(f"Se van a recorrer {len(self._links_to_go)} restaurantes")
-        # Extrayendo la información de los restaurantes faltantes
-        for rest_name, restaurant_link, restaurant_status in self._links_to_go:
-            del self._driver.requests
-            self.scrap_restaurante(rest_name, restaurant_link, restaurant_status)
+        return [
+            restaurant
+            for value in node.values()
+            for restaurant in self.find_restaurants(value)
+        ]
+
+    def extract_restaurants(self, params=None):
+        """Detecta los restaurantes de una página del listado recorriendo todas sus páginas
+
+        Args:
+            params (dict, optional): Parámetros de la consulta del listado. Defaults to None.
+        """
+        # Enlaces vistos en este listado, sin contar los detectados en otros listados
+        listing_links = set()
+        page = 1
+        while True:
+            try:
+                page_props = self.get_page_props(
+                    "restaurantes", {**(params or {}), "page": page}
+                )
+            except Exception as error:
+                LOGGER.error(f"No se ha podido obtener la página {page} del listado")
+                LOGGER.error(error)
+                return
+            restaurants = {
+                restaurant[1]: restaurant
+                for restaurant in self.find_restaurants(page_props)
+                if restaurant[1] not in listing_links
+            }
+            # La última página está vacía o repite restaurantes de este mismo listado
+            if not restaurants:
+                return
+            listing_links.update(restaurants)
+            self._restaurants.update(
+                (link, restaurant)
+                for link, restaurant in restaurants.items()
+                if link not in self._restaurants
+            )
+            LOGGER.info(
+                f"Cantidad de restaurantes totales detectados: {len(self._restaurants)}"
+            )
+            page += 1
+
+    def extract_all_products(self, restaurants):
+        """Extrae los productos de varios restaurantes a la vez con un hilo por petición en curso
+
+        Args:
+            restaurants (list): Lista de tuplas con el nombre, enlace web y estado de los restaurantes
+        """
+        with futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            # Los productos se agregan desde el hilo principal a medida que llegan
+            for products in executor.map(
+                lambda restaurant: self.extract_products(*restaurant), restaurants
+            ):
+                self.add_products(products)
+
+    def extract_data(self):
+        """Extrae todos los productos que ofertan los restaurantes en Rappi"""
+        LOGGER.info("Extrayendo los productos de rappi")
+        if DOM_SCRAPING:
+            self.scrap_restaurants()
+        else:
+            # Restaurantes más cercanos
+            self.extract_restaurants()
+            # Restaurantes por categorías
+            categories = self.get_page_props("restaurantes").get("categories", [])
+            LOGGER.info(
+                f"Se han detectado {len(categories)} tipos de restaurantes según su categoría"
+            )
+            for category in categories:
+                LOGGER.info(f"Categoría: {category.get('name')}")
+                self.extract_restaurants({"category": category["id"]})
+
+        # Extracción concurrente de los productos de los restaurantes
+        LOGGER.info(
+            f"Se va a extraer información de los productos de {len(self._restaurants)} restaurante(s) con {MAX_WORKERS} petición(es) simultánea(s)"
+        )
+        self.extract_all_products(self._restaurants.values())
+        self._metadata.num_errors += len(self._links_to_go)
+        LOGGER.info(
+            f"Se extrajo la información de {len(self._restaurants)} restaurante(s)"
+        )
+
+        if DOM_SCRAPING:
+            LOGGER.info(f"Se van a recorrer {len(self._links_to_go)} restaurantes")
+            # Extrayendo la información de los restaurantes faltantes
+            for (
+                rest_name,
+                restaurant_link,
+                restaurant_status,
+            ) in self._links_to_go.values():
+                self.scrap_restaurante(rest_name, restaurant_link, restaurant_status)
+        else:
+            LOGGER.info(
+                f"No se pudo extraer la información de {len(self._links_to_go)} restaurante(s)"
+            )
+        self._raw_file.close()
         LOGGER.info("Extracción de datos completada satisfactoriamente")
 
+    def open_raw_data(self, filepath, filename, encoding="utf-8"):
+        """Abre el archivo donde se van escribiendo los productos a medida que se extraen
+
+        Args:
+            filepath (str): Ruta del archivo
+            filename (str): Nombre del archivo
+            encoding (str): Codificación usada para guardar el archivo. Defaults to "utf-8"
+        """
+        # Generando la ruta donde se va a guardar la información sin procesar
+        filepath = os.path.join(filepath, CURRENT_DATE.strftime("%d-%m-%Y"))
+        filename = filename + "_" + CURRENT_DATE.strftime("%Y-%m-%d") + "_raw.csv"
+
+        # Verificando si la ruta donde se va a guardar la información existe
+        if not os.path.exists(filepath):
+            os.makedirs(filepath)
+
+        self._raw_path = os.path.join(filepath, filename)
+        self._raw_file = open(self._raw_path, "w", newline="", encoding=encoding)
+        self._raw_writer = csv.writer(self._raw_file, delimiter="\x01")
+
     def process_data(self):
         """Proceso de limpieza de datos extraídos por el scraper"""
         try:
             LOGGER.info("Limpiando la data extraída por el scraper")
-            self._dataset = pd.DataFrame(
-                self._products,
-                columns=[
-                    "Popular",
-                    "Producto",
-                    "Descripcion",
-                    "Precio con descuento",
-                    "Precio sin descuento",
-                    "Restaurante",
-                    "Disponible",
-                    "Categoria",
-                ],
+            if not self._products:
+                LOGGER.info("No se ha extraído ningún producto")
+                os.remove(self._raw_path)
+                return
+            # Construir el dataset con el lector de csv de pandas
+            self._dataset = pd.read_csv(
+                self._raw_path,
+                sep="\x01",
+                names=PRODUCT_COLUMNS,
+                dtype={
+                    "Popular": "bool",
+                    "Precio con descuento": "float64",
+                    "Precio sin descuento": "float64",
+                },
+                keep_default_na=False,
+                na_values=[""],
+                encoding="utf-8",
+                engine="c",
             )
-            self._products = []
+            # Conservar solo las filas vigentes de cada producto
+            self._dataset = self._dataset.take(
+                sorted(row for row, _ in self._products.values())
+            ).reset_index(drop=True)
+            self._products.clear()
+            os.remove(self._raw_path)
             self._dataset["Fecha"] = CURRENT_DATE.strftime("%Y-%m-%d")
-            self._dataset.sort_values(
-                ["Restaurante", "Producto", "Descripcion", "Popular"],
-                inplace=True,
-                ascending=[True, True, True, False],
-            )
-            self._dataset.drop_duplicates(
-                ["Restaurante", "Producto", "Descripcion"], keep="first", inplace=True
-            )
             self._dataset.replace({"": None}, inplace=True)
-            self._dataset = self._dataset.astype(
-                {
-                    "Precio con descuento": float,
-                    "Precio sin descuento": float,
-                    "Popular": str,
-                }
-            )
+            self._dataset = self._dataset.astype({"Popular": str})
             self._dataset["Precio con descuento"] = self._dataset[
                 "Precio con descuento"
-            ].apply(lambda x: round(x, 2))
+            ].round(2)
             self._dataset.loc[
                 self._dataset[
                     self._dataset["Precio con descuento"]
@@ -525,31 +868,44 @@ class ScraperRappiProducts:
                 ].index,
                 "Precio con descuento",
             ] = None
-            self._dataset[
-                ["Precio con descuento", "Precio sin descuento"]
-            ] = self._dataset[
-                ["Precio con descuento", "Precio sin descuento"]
-            ].applymap(
-                "{:,.2f}".format
+            self.format_price("Precio con descuento")
+            self.format_price("Precio sin descuento")
+            self._dataset["Disponible"] = self._dataset["Disponible"].replace(
+                OPENING_HOUR_REGEX, "Restaurante cerrado", regex=True
             )
-            self._dataset[["Precio con descuento", "Precio sin descuento"]] = (
-                self._dataset[["Precio con descuento", "Precio sin descuento"]]
-                .replace({",": ";", "\.": ","}, regex=True)
-                .replace({";": "."}, regex=True)
+            self._dataset["Categoria"] = self._dataset["Categoria"].replace(
+                NAME_SUFFIX_REGEX, "", regex=True
             )
-            self._dataset["Disponible"].replace(
-                "^Abre.+", "Restaurante cerrado", regex=True, inplace=True
+            self._dataset["Restaurante"] = self._dataset["Restaurante"].replace(
+                NAME_SUFFIX_REGEX, "", regex=True
             )
-            self._dataset["Categoria"].replace(" -.+", "", regex=True, inplace=True)
-            self._dataset["Restaurante"].replace(" -.+", "", regex=True, inplace=True)
-            self._dataset["Popular"].replace(
-                {"True": "popular", "False": ""}, inplace=True
+            self._dataset["Popular"] = self._dataset["Popular"].replace(
+                {"True": "popular", "False": ""}
             )
             LOGGER.info("Se ha limpiado la data satisfactoriamente")
         except Exception as error:
             LOGGER.error("Error al ejecutar el proceso completo de limpieza de datos")
             LOGGER.error(error)
 
+    def format_price(self, column):
+        """Da formato a una columna de precios con separador de miles "." y decimal ","
+
+        Args:
+            column (str): Nombre de la columna de precios del dataset
+        """
+        values = self._dataset[column].to_numpy(dtype="float64")
+        missing = np.isnan(values)
+        cents = np.round(np.where(missing, 0, values) * 100).astype("int64")
+        integer_part = (
+            pd.Series(cents // 100, index=self._dataset.index)
+            .astype(str)
+            .str.replace(THOUSANDS_REGEX, r"\1.", regex=True)
+        )
+        decimal_part = (
+            pd.Series(cents % 100, index=self._dataset.index).astype(str).str.zfill(2)
+        )
+        self._dataset[column] = (integer_part + "," + decimal_part).mask(missing)
+
     def save_data(self, filepath, filename, encoding="utf-8-sig"):
         """Guarda los datos o errores obtenidos durante la ejecución del scraper
 
@@ -597,11 +953,47 @@ class ScraperRappiProducts:
 
         Args:
             filename (str): Nombre del archivo
-            sheet_name (str): Nombre de la hoja de cálculo
+            sheet_name (str): Nombre de la hoja de cálculo, solo se usa con el formato xlsx
         """
         LOGGER.info("Guardando la metadata")
         self._metadata.set_attributes_values()
         self._metadata.print_metadata_information()
+        keys = [
+            "Fecha",
+            "Hora Inicio",
+            "Hora Fin",
+            "Cantidad",
+            "Tiempo Ejecucion (min)",
+            "Productos / Minuto",
+            "Errores",
+        ]
+        values = list(self._metadata.__dict__.values())[2:]
+
+        if METADATA_FORMAT == "xlsx":
+            self.save_metadata_xlsx(filename, sheet_name, keys, values)
+        else:
+            filename = os.path.splitext(filename)[0] + ".csv"
+            # Agregar la ejecución al final del archivo sin volver a leerlo
+            with open(filename, "a", newline="", encoding="utf-8-sig") as file:
+                writer = csv.writer(file, delimiter=";")
+                if file.tell() == 0:
+                    writer.writerow(keys)
+                writer.writerow(values)
+        LOGGER.info(
+            f"El archivo de la metadata del scraper {filename} ha sido guardado correctamente en la ruta {ROOT_PATH}",
+        )
+
+    def save_metadata_xlsx(self, filename, sheet_name, keys, values):
+        """Agrega la metadata de la ejecución a un archivo de excel
+
+        Args:
+            filename (str): Nombre del archivo
+            sheet_name (str): Nombre de la hoja de cálculo
+            keys (list): Encabezado de la metadata
+            values (list): Valores de la metadata de la ejecución
+        """
+        from openpyxl import load_workbook, Workbook
+
         # Variable que indica si el encabezado existe o no en el archivo de excel
         header_exist = False
 
@@ -623,28 +1015,16 @@ class ScraperRappiProducts:
 
         # Comprobando si el encabezado existe o no
         if not header_exist:
-            keys = [
-                "Fecha",
-                "Hora Inicio",
-                "Hora Fin",
-                "Cantidad",
-                "Tiempo Ejecucion (min)",
-                "Productos / Minuto",
-                "Errores",
-            ]
             worksheet.append(keys)
 
-        values = list(self._metadata.__dict__.values())[2:]
         worksheet.append(values)
         wb_time.save(filename)
         wb_time.close()
-        LOGGER.info(
-            f"El archivo de la metadata del scraper {filename} ha sido guardado correctamente en la ruta {ROOT_PATH}",
-        )
 
     def run(self):
         """Ejecuta el proceso completo de web scraping a Rappi"""
-        self.login(FB_USERNAME, FB_PASSWORD)
+        self.load_session(FB_USERNAME, FB_PASSWORD)
+        self.open_raw_data(DATA_FOLDER, DATA_FILENAME)
         self.extract_data()
         self.process_data()
         self.save_data(DATA_FOLDER, DATA_FILENAME)